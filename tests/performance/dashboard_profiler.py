@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+"""
+Query performance profiler for the shipped Grafana dashboards
+
+Parses the dashboard JSON files under configs/grafana/dashboards, extracts every
+panel's PromQL/LogQL target and replays them concurrently (the way Grafana does
+when a dashboard is opened) against a datasource at several time ranges.
+
+Usage:
+    python dashboard_profiler.py --fake
+    python dashboard_profiler.py --prometheus-url http://minikube-ip:port \\
+        --loki-url http://minikube-ip:port --ranges 1h,24h,7d
+"""
+
+import argparse
+import concurrent.futures
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+import requests
+
+DASHBOARD_DIR = Path(__file__).resolve().parents[2] / 'configs' / 'grafana' / 'dashboards'
+
+DEFAULT_RANGES = ['1h', '6h', '24h', '7d']
+SCRAPE_INTERVAL = 15  # seconds, matches configs/prometheus/prometheus.yml
+DASHBOARD_WIDTH_PX = 1920  # Grafana derives maxDataPoints from panel width
+GRID_COLUMNS = 24
+
+# The EDC dashboard is meant to ship but is misnamed with a trailing colon, so Grafana
+# provisioning does not load it today. It is profiled anyway, by name, so its queries
+# are already checked once the file is renamed.
+STRAY_DASHBOARD_FILES = ['edc-connector.json:']
+
+# Grafana's roundInterval: (upper bound, rounded interval) in seconds, nearest step wins
+ROUND_INTERVAL_THRESHOLDS = [
+    (1.5, 1), (3.5, 2), (7.5, 5), (12.5, 10), (17.5, 15), (25, 20), (45, 30),
+    (90, 60), (210, 120), (450, 300), (750, 600), (1050, 900), (1500, 1200),
+    (2700, 1800), (5400, 3600), (9000, 7200), (16200, 10800), (24300, 21600),
+    (64800, 43200), (604800, 86400), (1814400, 604800), (3628800, 2592000)
+]
+YEAR = 31536000
+
+DURATION_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+
+AGGREGATION_RE = re.compile(r'\b(sum|avg|min|max|count|topk|bottomk|quantile)\b\s*(by|without)?\s*\(')
+RANGE_FUNCTION_RE = re.compile(r'\b(rate|irate|increase|delta|\w+_over_time|count_over_time|bytes_rate)\s*\(')
+RANGE_WINDOW_RE = re.compile(r'\[(\d+[smhdw])\]')
+BY_LABELS_RE = re.compile(r'\b(?:by|without)\s*\(([^)]*)\)')
+
+
+def parse_duration(value: str) -> int:
+    """Convert a Prometheus style duration such as '5m' or '7d' to seconds"""
+    match = re.fullmatch(r'(\d+)([smhdw])', value.strip())
+    if not match:
+        raise ValueError(f"Invalid duration: {value}")
+    return int(match.group(1)) * DURATION_UNITS[match.group(2)]
+
+
+def format_duration(seconds: int) -> str:
+    """Format seconds as the largest whole Prometheus duration unit"""
+    for unit in ('w', 'd', 'h', 'm'):
+        if seconds % DURATION_UNITS[unit] == 0:
+            return f"{seconds // DURATION_UNITS[unit]}{unit}"
+    return f"{seconds}s"
+
+
+def round_interval(seconds: float) -> int:
+    """Round an interval to the nearest step, as Grafana's roundInterval does"""
+    for upper_bound, interval in ROUND_INTERVAL_THRESHOLDS:
+        if seconds <= upper_bound:
+            return interval
+    return YEAR
+
+
+def compute_interval(range_seconds: int, max_data_points: int,
+                     min_interval: int = SCRAPE_INTERVAL) -> int:
+    """Compute $__interval the way Grafana does: round range / maxDataPoints, then apply the min interval"""
+    return max(round_interval(range_seconds / max(max_data_points, 1)), min_interval)
+
+
+def load_dashboards(dashboard_dir: Path = DASHBOARD_DIR) -> List[Dict[str, Any]]:
+    """Load every dashboard JSON file in a directory"""
+    dashboard_dir = Path(dashboard_dir)
+    paths = set(dashboard_dir.glob('*.json'))
+    paths.update(dashboard_dir / name for name in STRAY_DASHBOARD_FILES
+                 if (dashboard_dir / name).is_file())
+
+    dashboards = []
+    for path in sorted(paths):
+        with open(path) as f:
+            data = json.load(f)
+        dashboard = data.get('dashboard', data)
+        dashboard['_file'] = path.name
+        dashboards.append(dashboard)
+    return dashboards
+
+
+def resolve_datasource_type(datasource: Any, expr: str) -> str:
+    """Work out whether a target is PromQL or LogQL"""
+    if isinstance(datasource, dict):
+        datasource = datasource.get('type') or datasource.get('uid')
+    if isinstance(datasource, str) and 'loki' in datasource.lower():
+        return 'loki'
+    if isinstance(datasource, str) and 'prometheus' in datasource.lower():
+        return 'prometheus'
+    # No datasource set: Prometheus is the default, LogQL always starts with a stream selector
+    if expr.lstrip().startswith('{') or '|=' in expr or '|~' in expr:
+        return 'loki'
+    return 'prometheus'
+
+
+def iter_panels(panels: List[Dict[str, Any]]):
+    """Yield panels, descending into collapsed rows"""
+    for panel in panels:
+        yield panel
+        yield from iter_panels(panel.get('panels', []))
+
+
+def extract_targets(dashboard: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Extract every panel query from a dashboard"""
+    targets = []
+    for position, panel in enumerate(iter_panels(dashboard.get('panels', []))):
+        width = panel.get('gridPos', {}).get('w', GRID_COLUMNS)
+        max_data_points = panel.get('maxDataPoints') or \
+            int(DASHBOARD_WIDTH_PX * width / GRID_COLUMNS)
+        min_interval = panel.get('interval')
+        for index, target in enumerate(panel.get('targets', [])):
+            expr = target.get('expr')
+            if not expr or target.get('hide'):
+                continue
+            datasource = target.get('datasource') or panel.get('datasource')
+            targets.append({
+                'dashboard': dashboard.get('title', dashboard.get('_file')),
+                'panel_id': panel.get('id'),
+                # Panel ids are optional, so the position identifies the panel
+                'panel_position': position,
+                'panel': panel.get('title', ''),
+                'ref_id': target.get('refId', chr(ord('A') + index)),
+                'expr': expr,
+                'datasource': resolve_datasource_type(datasource, expr),
+                'max_data_points': max_data_points,
+                'min_interval': parse_duration(min_interval) if min_interval else SCRAPE_INTERVAL
+            })
+    return targets
+
+
+def render_expr(expr: str, range_seconds: int, interval: int) -> str:
+    """Substitute the Grafana global variables used in panel queries"""
+    rate_interval = max(interval + SCRAPE_INTERVAL, 4 * SCRAPE_INTERVAL)
+    replacements = {
+        '$__rate_interval': format_duration(rate_interval),
+        '$__interval_ms': str(interval * 1000),
+        '$__interval': format_duration(interval),
+        '$__range_s': str(range_seconds),
+        '$__range_ms': str(range_seconds * 1000),
+        '$__range': format_duration(range_seconds),
+    }
+    for variable, value in replacements.items():
+        expr = expr.replace(variable, value).replace('${' + variable[1:] + '}', value)
+    return expr
+
+
+class HTTPDatasource:
+    """Runs range queries against real Prometheus and Loki HTTP APIs"""
+
+    def __init__(self, prometheus_url: Optional[str] = None, loki_url: Optional[str] = None,
+                 timeout: int = 60):
+        self.urls = {'prometheus': prometheus_url, 'loki': loki_url}
+        self.timeout = timeout
+
+    def query(self, kind: str, expr: str, start: float, end: float, step: int) -> List[Dict[str, Any]]:
+        """Run a range query and return the result series"""
+        base_url = self.urls.get(kind)
+        if not base_url:
+            raise RuntimeError(f"No {kind} URL configured")
+
+        if kind == 'loki':
+            url = f"{base_url}/loki/api/v1/query_range"
+            params = {'query': expr, 'start': int(start * 1e9), 'end': int(end * 1e9),
+                      'step': step, 'limit': 1000}
+        else:
+            url = f"{base_url}/api/v1/query_range"
+            params = {'query': expr, 'start': start, 'end': end, 'step': step}
+
+        response = requests.get(url, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        data = response.json()
+        if data.get('status') != 'success':
+            raise RuntimeError(data.get('error', 'query failed'))
+        return data['data']['result']
+
+
+class FakeDatasource:
+    """In-process datasource that models query cost without a running cluster
+
+    Series count is derived from the query shape (aggregations collapse series,
+    'by' labels multiply them out by their cardinality) and latency grows with
+    the number of raw samples the query has to touch.
+    """
+
+    def __init__(self, cardinality: Optional[Dict[str, int]] = None, default_series: int = 50,
+                 seconds_per_million_samples: float = 0.5, base_latency: float = 0.005):
+        self.cardinality = cardinality or {'node': 3, 'namespace': 8, 'service': 12,
+                                           'result': 2, 'instance': 4}
+        self.default_series = default_series
+        self.seconds_per_million_samples = seconds_per_million_samples
+        self.base_latency = base_latency
+
+    def series_count(self, expr: str) -> int:
+        """Estimate the number of series a query returns"""
+        if not AGGREGATION_RE.search(expr):
+            return self.default_series
+        by_match = BY_LABELS_RE.search(expr)
+        if not by_match:
+            return 1
+        count = 1
+        for label in by_match.group(1).split(','):
+            count *= self.cardinality.get(label.strip(), 5)
+        return count
+
+    def query(self, kind: str, expr: str, start: float, end: float, step: int) -> List[Dict[str, Any]]:
+        """Return synthetic series after sleeping for the modelled latency"""
+        points = int((end - start) // step) + 1
+        windows = [parse_duration(w) for w in RANGE_WINDOW_RE.findall(expr)]
+        samples_per_point = max(windows) / SCRAPE_INTERVAL if windows else 1
+        # Raw selectors are read from every underlying series, not the aggregated output
+        samples = self.default_series * points * samples_per_point
+        time.sleep(self.base_latency + samples / 1e6 * self.seconds_per_million_samples)
+
+        series = []
+        for i in range(self.series_count(expr)):
+            values = [[start + p * step, '0'] for p in range(points)]
+            if kind == 'loki':
+                series.append({'stream': {'series': str(i)}, 'values': values})
+            else:
+                series.append({'metric': {'series': str(i)}, 'values': values})
+        return series
+
+
+class DashboardProfiler:
+    """Replays dashboard panel queries and reports their cost"""
+
+    def __init__(self, datasource, ranges: Optional[List[str]] = None, concurrency: int = 16,
+                 slow_query_threshold: float = 1.0, max_series: int = 500,
+                 max_panel_points: int = 20000):
+        self.datasource = datasource
+        self.ranges = ranges or DEFAULT_RANGES
+        self.concurrency = concurrency
+        self.slow_query_threshold = slow_query_threshold
+        self.max_series = max_series
+        self.max_panel_points = max_panel_points
+
+    def run_target(self, target: Dict[str, Any], range_seconds: int, end: float) -> Dict[str, Any]:
+        """Run a single panel target and measure latency and result size"""
+        interval = compute_interval(range_seconds, target['max_data_points'], target['min_interval'])
+        expr = render_expr(target['expr'], range_seconds, interval)
+        start_time = time.time()
+        try:
+            series = self.datasource.query(target['datasource'], expr,
+                                           end - range_seconds, end, interval)
+            latency = time.time() - start_time
+            return {
+                'success': True,
+                'latency': latency,
+                'interval': interval,
+                'series': len(series),
+                'data_points': sum(len(s.get('values', [])) for s in series)
+            }
+        except Exception as e:
+            return {
+                'success': False,
+                'latency': time.time() - start_time,
+                'interval': interval,
+                'series': 0,
+                'data_points': 0,
+                'error': str(e)
+            }
+
+    def profile_range(self, targets: List[Dict[str, Any]], range_name: str) -> List[Dict[str, Any]]:
+        """Fire every target at once for one time range, as opening the dashboard does"""
+        range_seconds = parse_duration(range_name)
+        end = time.time()
+        results = []
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = {executor.submit(self.run_target, target, range_seconds, end): target
+                       for target in targets}
+            for future in concurrent.futures.as_completed(futures):
+                result = future.result()
+                result.update(futures[future])
+                result['range'] = range_name
+                results.append(result)
+
+        return results
+
+    def profile(self, dashboards: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Profile all dashboards at every configured time range"""
+        report = {'ranges': self.ranges, 'dashboards': []}
+        for dashboard in dashboards:
+            targets = extract_targets(dashboard)
+            runs = {}
+            wall_clock = {}
+            for range_name in self.ranges:
+                start_time = time.time()
+                runs[range_name] = self.profile_range(targets, range_name)
+                wall_clock[range_name] = time.time() - start_time
+            report['dashboards'].append({
+                'title': dashboard.get('title', dashboard.get('_file')),
+                'file': dashboard.get('_file'),
+                'load_time': wall_clock,
+                'panels': self.summarize_panels(runs)
+            })
+        return report
+
+    def summarize_panels(self, runs: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Combine target results into per-panel, per-range figures"""
+        panels = {}
+        for range_name, results in runs.items():
+            for result in results:
+                panel = panels.setdefault(result['panel_position'], {
+                    'panel_id': result['panel_id'],
+                    'panel_position': result['panel_position'],
+                    'panel': result['panel'],
+                    'targets': {},
+                    'ranges': {}
+                })
+                panel['targets'][result['ref_id']] = result['expr']
+                stats = panel['ranges'].setdefault(range_name, {
+                    # Targets of one panel run in parallel, so the slowest one gates the panel
+                    'latency': 0.0, 'series': 0, 'data_points': 0,
+                    'interval': result['interval'], 'max_data_points': result['max_data_points'],
+                    'min_interval': result['min_interval'],
+                    'errors': []
+                })
+                stats['latency'] = max(stats['latency'], result['latency'])
+                stats['series'] += result['series']
+                stats['data_points'] += result['data_points']
+                if not result['success']:
+                    stats['errors'].append(f"{result['ref_id']}: {result['error']}")
+
+        summaries = sorted(panels.values(), key=lambda p: p['panel_position'])
+        for panel in summaries:
+            panel['recommendations'] = self.recommend(panel)
+        return summaries
+
+    def recommend(self, panel: Dict[str, Any]) -> List[str]:
+        """Flag panels that need a recording rule or a coarser interval"""
+        recommendations = []
+        widest = self.ranges[-1]
+        exprs = list(panel['targets'].values())
+        slow = [r for r, s in panel['ranges'].items() if s['latency'] >= self.slow_query_threshold]
+
+        precomputable = [e for e in exprs if AGGREGATION_RE.search(e) and RANGE_FUNCTION_RE.search(e)]
+        if slow and precomputable:
+            recommendations.append(
+                f"recording rule: aggregated range query takes "
+                f"{panel['ranges'][slow[-1]]['latency']:.2f}s at {slow[-1]}")
+        elif panel['ranges'].get(widest, {}).get('series', 0) > self.max_series:
+            recommendations.append(
+                f"recording rule: returns {panel['ranges'][widest]['series']} series at {widest}")
+
+        hardcoded = [parse_duration(w) for e in exprs for w in RANGE_WINDOW_RE.findall(e)]
+        for range_name, stats in panel['ranges'].items():
+            if hardcoded and min(hardcoded) < stats['interval']:
+                recommendations.append(
+                    f"$__rate_interval: fixed [{format_duration(min(hardcoded))}] window is shorter "
+                    f"than the {format_duration(stats['interval'])} step at {range_name}, samples are skipped")
+                break
+
+        # The step already caps points per series, so judge the panel's total
+        # points and a min interval that lets the step drop below the scrape interval
+        min_interval = min(s['min_interval'] for s in panel['ranges'].values())
+        if min_interval < SCRAPE_INTERVAL:
+            recommendations.append(
+                f"larger $__interval: min interval {format_duration(min_interval)} is below the "
+                f"{format_duration(SCRAPE_INTERVAL)} scrape interval, extra points repeat samples")
+        else:
+            for range_name, stats in panel['ranges'].items():
+                if stats['data_points'] > self.max_panel_points:
+                    recommendations.append(
+                        f"larger $__interval: {stats['data_points']} points at {range_name} exceed "
+                        f"the {self.max_panel_points} point budget per panel")
+                    break
+
+        return recommendations
+
+
+def print_report(report: Dict[str, Any]):
+    """Print a human readable profiling report"""
+    for dashboard in report['dashboards']:
+        print(f"\n{dashboard['title']} ({dashboard['file']})")
+        print("  Load time: " + ", ".join(
+            f"{r}={t:.2f}s" for r, t in dashboard['load_time'].items()))
+        print(f"  {'Panel':<32} {'Range':>6} {'Step':>6} {'Latency':>9} {'Series':>7} {'Points':>9}")
+        for panel in dashboard['panels']:
+            for range_name, stats in panel['ranges'].items():
+                print(f"  {panel['panel'][:32]:<32} {range_name:>6} "
+                      f"{format_duration(stats['interval']):>6} {stats['latency']:>8.3f}s "
+                      f"{stats['series']:>7} {stats['data_points']:>9}")
+                for error in stats['errors']:
+                    print(f"    ! {error}")
+            for recommendation in panel['recommendations']:
+                print(f"    -> {recommendation}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Profile Grafana dashboard panel queries")
+    parser.add_argument('--dashboards', default=str(DASHBOARD_DIR),
+                        help="Directory containing dashboard JSON files")
+    parser.add_argument('--prometheus-url', help="Prometheus base URL")
+    parser.add_argument('--loki-url', help="Loki base URL")
+    parser.add_argument('--fake', action='store_true',
+                        help="Use the in-process fake datasource instead of a real one")
+    parser.add_argument('--ranges', default=','.join(DEFAULT_RANGES),
+                        help="Comma separated time ranges, e.g. 1h,24h,7d")
+    parser.add_argument('--concurrency', type=int, default=16,
+                        help="Maximum number of queries in flight")
+    parser.add_argument('--slow-threshold', type=float, default=1.0,
+                        help="Panel latency in seconds above which a recording rule is suggested")
+    parser.add_argument('--max-panel-points', type=int, default=20000,
+                        help="Data points per panel above which a larger $__interval is suggested")
+    parser.add_argument('--json', dest='json_output', help="Write the full report to this file")
+    args = parser.parse_args(argv)
+
+    if args.fake:
+        datasource = FakeDatasource()
+    elif args.prometheus_url or args.loki_url:
+        datasource = HTTPDatasource(args.prometheus_url, args.loki_url)
+    else:
+        parser.error("either --fake or --prometheus-url/--loki-url is required")
+
+    profiler = DashboardProfiler(datasource, ranges=args.ranges.split(','),
+                                 concurrency=args.concurrency,
+                                 slow_query_threshold=args.slow_threshold,
+                                 max_panel_points=args.max_panel_points)
+    report = profiler.profile(load_dashboards(Path(args.dashboards)))
+    print_report(report)
+
+    if args.json_output:
+        with open(args.json_output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.json_output}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
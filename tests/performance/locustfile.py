@@ -1,10 +1,50 @@
 """
 Locust performance test file for web-based load testing
 Usage: locust -f locustfile.py --host=http://minikube-ip:port
+
+Set TRACE_SAMPLE_RATE (e.g. 0.05) to additionally probe a sampled subset of
+requests with per-phase timings and TRACE_OUTPUT to export them as OTLP/JSON at
+test stop. In distributed mode each worker writes TRACE_OUTPUT with its worker
+id appended. Probes are extra requests on a fresh connection, tagged
+trace.probe=cold_connection: they measure cold-connection latency, add load at
+roughly the sample rate and are kept out of Locust's own statistics.
 """
 
-from locust import HttpUser, task, between
+from locust import HttpUser, task, between, events
+from locust.runners import WorkerRunner
 import json
+import os
+
+from request_tracing import TraceRecorder, traced_request
+
+trace_recorder = TraceRecorder.from_environment()
+
+
+@events.test_stop.add_listener
+def export_traces(environment, **kwargs):
+    """Write sampled request traces when the load test stops"""
+    output = os.environ.get('TRACE_OUTPUT')
+    if not output or not trace_recorder.traces:
+        return
+    if isinstance(environment.runner, WorkerRunner):
+        # Every worker fires test_stop; give each its own file so they don't overwrite
+        root, ext = os.path.splitext(output)
+        output = f"{root}-{environment.runner.client_id}{ext}"
+    trace_recorder.export(output)
+
+
+def get(user, path):
+    """Issue a GET request, probing per-phase timings for sampled requests"""
+    response = user.client.get(path)
+
+    if trace_recorder.should_sample():
+        # Cold-connection probe: pays DNS/connect/TLS that pooled requests skip, so it is
+        # recorded only in the trace file and not fired into Locust's request statistics
+        url = f"{user.host.rstrip('/')}/{path.lstrip('/')}"
+        trace_recorder.record(traced_request(url, headers=dict(user.client.headers)))
+
+    return response
+
 
 class EDCUser(HttpUser):
     """Locust user for EDC performance testing"""
@@ -14,27 +54,27 @@ class EDCUser(HttpUser):
     def on_start(self):
         """Called when a user starts"""
         # Test connectivity
-        self.client.get("/api/check/health")
+        get(self, "/api/check/health")
     
     @task(3)
     def health_check(self):
         """Health check endpoint - most frequent"""
-        self.client.get("/api/check/health")
+        get(self, "/api/check/health")
     
     @task(2)
     def readiness_check(self):
         """Readiness check endpoint"""
-        self.client.get("/api/check/readiness")
+        get(self, "/api/check/readiness")
     
     @task(1)
     def list_assets(self):
         """List assets - less frequent"""
-        self.client.get("/api/management/v2/assets")
+        get(self, "/api/management/v2/assets")
     
     @task(1)
     def list_policies(self):
         """List policies - less frequent"""
-        self.client.get("/api/management/v2/policydefinitions")
+        get(self, "/api/management/v2/policydefinitions")
 
 
 class TractusXUser(HttpUser):
@@ -51,4 +91,4 @@ class TractusXUser(HttpUser):
         ]
         
         for endpoint in endpoints:
-            self.client.get(endpoint)
\ No newline at end of file
+            get(self, endpoint)
\ No newline at end of file
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Per-phase request tracing for the load engines
+
+A sampled subset of load test requests is issued over a fresh, hand-built
+connection so that DNS lookup, TCP connect, TLS handshake, server processing
+(time to first byte) and body download can be timed separately. Every traced
+request is therefore a cold-connection measurement. Traces are exported as
+OTLP-compatible JSON: one span per request with a child span per phase.
+
+Usage:
+    python request_tracing.py traces.json [more-traces.json ...]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import ssl
+import statistics
+import sys
+import threading
+import time
+from typing import List, Dict, Any, Optional
+from urllib.parse import urlparse
+
+PHASES = ('dns', 'connect', 'tls', 'server', 'download')
+PERCENTILES = (50, 90, 99)
+SCOPE_NAME = 'tractus-x-devops.performance'
+COLD_CONNECTION_PROBE = 'cold_connection'
+
+
+def traced_request(url: str, method: str = 'GET', timeout: int = 30,
+                   headers: Optional[Dict[str, str]] = None,
+                   body: Optional[bytes] = None) -> Dict[str, Any]:
+    """Make a single request and measure the time spent in each phase"""
+    parsed = urlparse(url)
+    https = parsed.scheme == 'https'
+    port = parsed.port or (443 if https else 80)
+    path = parsed.path or '/'
+    if parsed.query:
+        path = f"{path}?{parsed.query}"
+
+    phases = {}
+    result = {
+        'method': method,
+        'url': url,
+        'endpoint': f"{method} {parsed.netloc}{parsed.path or '/'}",
+        'route': parsed.path or '/',
+        'probe': COLD_CONNECTION_PROBE,
+        'start_time_ns': time.time_ns(),
+        'phases': phases
+    }
+    start_time = mark = time.perf_counter()
+
+    def lap(phase):
+        nonlocal mark
+        now = time.perf_counter()
+        phases[phase] = now - mark
+        mark = now
+
+    sock = None
+    try:
+        addresses = socket.getaddrinfo(parsed.hostname, port, type=socket.SOCK_STREAM)
+        lap('dns')
+
+        # Try each resolved address in turn, like socket.create_connection does
+        for index, (family, socktype, proto, _, address) in enumerate(addresses):
+            sock = socket.socket(family, socktype, proto)
+            sock.settimeout(timeout)
+            try:
+                sock.connect(address)
+                break
+            except OSError:
+                sock.close()
+                sock = None
+                if index == len(addresses) - 1:
+                    raise
+        lap('connect')
+
+        if https:
+            sock = ssl.create_default_context().wrap_socket(sock, server_hostname=parsed.hostname)
+            lap('tls')
+        else:
+            phases['tls'] = 0.0
+
+        # Hand the established socket to http.client so it does not reconnect; the
+        # connection class only decides the default port used in the Host header
+        connection_class = http.client.HTTPSConnection if https else http.client.HTTPConnection
+        connection = connection_class(parsed.hostname, port, timeout=timeout)
+        connection.sock = sock
+        connection.request(method, path, body=body, headers=headers or {})
+        response = connection.getresponse()
+        lap('server')
+
+        payload = response.read()
+        lap('download')
+
+        result.update({
+            'success': response.status == 200,
+            'status_code': response.status,
+            'response_length': len(payload)
+        })
+    except Exception as e:
+        result.update({
+            'success': False,
+            'response_length': 0,
+            'error': str(e)
+        })
+    finally:
+        if sock is not None:
+            sock.close()
+
+    result['response_time'] = time.perf_counter() - start_time
+    return result
+
+
+class TraceRecorder:
+    """Thread-safe collector for a sampled subset of traced requests"""
+
+    def __init__(self, sample_rate: float = 0.0, service_name: str = 'load-test'):
+        self.sample_rate = sample_rate
+        self.service_name = service_name
+        self.traces = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_environment(cls, default_sample_rate: float = 0.0) -> 'TraceRecorder':
+        """Create a recorder configured by TRACE_SAMPLE_RATE"""
+        return cls(float(os.environ.get('TRACE_SAMPLE_RATE', default_sample_rate)))
+
+    def should_sample(self) -> bool:
+        """Decide whether the next request should be traced"""
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def record(self, result: Dict[str, Any]):
+        """Store a traced request result"""
+        with self._lock:
+            self.traces.append(result)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """Convert recorded traces to an OTLP/JSON ExportTraceServiceRequest"""
+        with self._lock:
+            traces = list(self.traces)
+
+        spans = []
+        for trace in traces:
+            trace_id = os.urandom(16).hex()
+            root_id = os.urandom(8).hex()
+            start_ns = trace['start_time_ns']
+            attributes = [
+                _attribute('http.request.method', trace['method']),
+                _attribute('url.full', trace['url']),
+                _attribute('http.route', trace['route']),
+                _attribute('trace.probe', trace['probe'])
+            ]
+            if 'status_code' in trace:
+                attributes.append(_attribute('http.response.status_code', trace['status_code']))
+            status = {'code': 1} if trace['success'] else {'code': 2, 'message': trace.get('error', '')}
+
+            spans.append({
+                'traceId': trace_id,
+                'spanId': root_id,
+                'name': trace['endpoint'],
+                'kind': 3,  # SPAN_KIND_CLIENT
+                'startTimeUnixNano': str(start_ns),
+                'endTimeUnixNano': str(start_ns + int(trace['response_time'] * 1e9)),
+                'attributes': attributes,
+                'status': status
+            })
+
+            offset_ns = start_ns
+            for phase in PHASES:
+                if phase not in trace['phases']:
+                    continue
+                duration_ns = int(trace['phases'][phase] * 1e9)
+                spans.append({
+                    'traceId': trace_id,
+                    'spanId': os.urandom(8).hex(),
+                    'parentSpanId': root_id,
+                    'name': phase,
+                    'kind': 1,  # SPAN_KIND_INTERNAL
+                    'startTimeUnixNano': str(offset_ns),
+                    'endTimeUnixNano': str(offset_ns + duration_ns)
+                })
+                offset_ns += duration_ns
+
+        return {
+            'resourceSpans': [{
+                'resource': {'attributes': [_attribute('service.name', self.service_name)]},
+                'scopeSpans': [{'scope': {'name': SCOPE_NAME}, 'spans': spans}]
+            }]
+        }
+
+    def export(self, path: str):
+        """Write recorded traces as OTLP/JSON"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.to_otlp(), f, separators=(',', ':'))
+
+
+def _attribute(key: str, value: Any) -> Dict[str, Any]:
+    """Build an OTLP key/value attribute"""
+    if isinstance(value, int):
+        return {'key': key, 'value': {'intValue': str(value)}}
+    return {'key': key, 'value': {'stringValue': str(value)}}
+
+
+def load_traces(path: str) -> List[Dict[str, Any]]:
+    """Read OTLP/JSON traces back into per-request phase timings"""
+    with open(path) as f:
+        data = json.load(f)
+
+    requests_by_span = {}
+    phase_spans = []
+    for resource_spans in data.get('resourceSpans', []):
+        for scope_spans in resource_spans.get('scopeSpans', []):
+            for span in scope_spans.get('spans', []):
+                duration = (int(span['endTimeUnixNano']) - int(span['startTimeUnixNano'])) / 1e9
+                if span.get('parentSpanId'):
+                    phase_spans.append((span['parentSpanId'], span['name'], duration))
+                else:
+                    trace = {
+                        'endpoint': span['name'],
+                        'success': span.get('status', {}).get('code') != 2,
+                        'response_time': duration,
+                        'phases': {}
+                    }
+                    attributes = {a['key']: a['value'] for a in span.get('attributes', [])}
+                    if 'trace.probe' in attributes:
+                        trace['probe'] = attributes['trace.probe']['stringValue']
+                    if 'http.response.status_code' in attributes:
+                        trace['status_code'] = int(attributes['http.response.status_code']['intValue'])
+                    requests_by_span[span['spanId']] = trace
+
+    for parent_id, phase, duration in phase_spans:
+        if parent_id in requests_by_span:
+            requests_by_span[parent_id]['phases'][phase] = duration
+
+    return list(requests_by_span.values())
+
+
+def percentile(values: List[float], pct: int) -> float:
+    """Return the given percentile of a list of values"""
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method='inclusive')[pct - 1]
+
+
+def summarize(traces: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Compute phase-level percentiles for each endpoint"""
+    by_endpoint = {}
+    for trace in traces:
+        by_endpoint.setdefault(trace['endpoint'], []).append(trace)
+
+    summary = {}
+    for endpoint, endpoint_traces in sorted(by_endpoint.items()):
+        successful = [t for t in endpoint_traces if t['success']]
+        phases = {}
+        for phase in PHASES + ('total',):
+            # Failed requests count too: a slow 5xx is exactly the tail to attribute.
+            # Requests that died early only contribute the phases they reached.
+            if phase == 'total':
+                values = [t['response_time'] for t in endpoint_traces if 'status_code' in t]
+            else:
+                values = [t['phases'][phase] for t in endpoint_traces if phase in t['phases']]
+            if values:
+                phases[phase] = {f"p{p}": percentile(values, p) for p in PERCENTILES}
+                phases[phase]['max'] = max(values)
+
+        summary[endpoint] = {
+            'requests': len(endpoint_traces),
+            'errors': len(endpoint_traces) - len(successful),
+            'probes': sorted({t['probe'] for t in endpoint_traces if 'probe' in t}),
+            'phases': phases
+        }
+    return summary
+
+
+def print_summary(summary: Dict[str, Dict[str, Any]]):
+    """Print phase-level percentile breakdowns per endpoint"""
+    for endpoint, stats in summary.items():
+        kind = ', '.join(p.replace('_', '-') for p in stats['probes'])
+        traced = f"{stats['requests']} traced {kind} probes" if kind else f"{stats['requests']} traced"
+        print(f"\n{endpoint}  ({traced}, {stats['errors']} errors)")
+        header = ''.join(f"{'p' + str(p):>10}" for p in PERCENTILES)
+        print(f"  {'Phase':<10}{header}{'max':>10}")
+        for phase, values in stats['phases'].items():
+            row = ''.join(f"{values['p' + str(p)] * 1000:>8.1f}ms" for p in PERCENTILES)
+            print(f"  {phase:<10}{row}{values['max'] * 1000:>8.1f}ms")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Summarize per-phase request traces")
+    parser.add_argument('traces', nargs='+', help="OTLP/JSON trace files written by the load engines")
+    parser.add_argument('--json', dest='json_output', help="Write the summary to this file")
+    args = parser.parse_args(argv)
+
+    traces = []
+    for path in args.traces:
+        traces.extend(load_traces(path))
+
+    summary = summarize(traces)
+    print_summary(summary)
+
+    if args.json_output:
+        with open(args.json_output, 'w') as f:
+            json.dump(summary, f, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
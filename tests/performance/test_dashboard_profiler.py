@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Tests for the Grafana dashboard query profiler
+"""
+
+import pytest
+import json
+
+from dashboard_profiler import (
+    DashboardProfiler, FakeDatasource, compute_interval, extract_targets,
+    load_dashboards, render_expr
+)
+
+
+class TestDashboardProfiler:
+    """Tests for dashboard parsing and query profiling"""
+
+    @pytest.fixture
+    def dashboards(self):
+        """Dashboards shipped in configs/grafana/dashboards"""
+        return load_dashboards()
+
+    @pytest.fixture
+    def fake_datasource(self):
+        """Fake datasource with negligible latency"""
+        return FakeDatasource(seconds_per_million_samples=0.01, base_latency=0)
+
+    def test_shipped_dashboards_parsed(self, dashboards):
+        """Test that every shipped dashboard yields panel targets"""
+        titles = {d['title'] for d in dashboards}
+        assert {'EDC Connector Dashboard', 'Kubernetes Cluster', 'Tractus-X Overview'} <= titles
+
+        for dashboard in dashboards:
+            targets = extract_targets(dashboard)
+            assert targets, f"No targets found in {dashboard['_file']}"
+            assert all(t['datasource'] == 'prometheus' for t in targets)
+
+    def test_backup_files_are_ignored(self, tmp_path):
+        """Test that only dashboard JSON files are loaded"""
+        (tmp_path / 'overview.json').write_text(json.dumps({'dashboard': {'title': 'Overview'}}))
+        (tmp_path / 'overview.json.bak').write_text('not json')
+        (tmp_path / 'overview.json.orig').write_text('{')
+
+        dashboards = load_dashboards(tmp_path)
+        assert [d['_file'] for d in dashboards] == ['overview.json']
+
+    def test_nested_row_panels_and_loki_targets(self):
+        """Test that collapsed rows are descended into and LogQL is detected"""
+        dashboard = {
+            'title': 'Logs',
+            'panels': [{
+                'id': 1,
+                'type': 'row',
+                'panels': [{
+                    'id': 2,
+                    'title': 'EDC errors',
+                    'datasource': {'type': 'loki', 'uid': 'loki'},
+                    'targets': [{'expr': 'sum(count_over_time({namespace="tractus-x"} |= "ERROR" [5m]))'}]
+                }, {
+                    'id': 3,
+                    'title': 'Hidden',
+                    'targets': [{'expr': 'up', 'hide': True}]
+                }]
+            }]
+        }
+        targets = extract_targets(dashboard)
+        assert len(targets) == 1
+        assert targets[0]['panel_id'] == 2
+        assert targets[0]['datasource'] == 'loki'
+
+    def test_interval_and_variable_substitution(self):
+        """Test $__interval computation and Grafana variable rendering"""
+        assert compute_interval(3600, 960) == 15
+        # 7d / 960 = 630s, which Grafana rounds to the nearest step: 10m, not 15m
+        assert compute_interval(7 * 86400, 960) == 600
+        assert compute_interval(86400, 1920, min_interval=60) == 60
+
+        expr = render_expr('sum(rate(x[$__rate_interval])) / $__range_s', 3600, 15)
+        assert expr == 'sum(rate(x[1m])) / 3600'
+
+    def test_profile_reports_latency_series_and_points(self, dashboards, fake_datasource):
+        """Test that every panel is profiled at every range"""
+        profiler = DashboardProfiler(fake_datasource, ranges=['1h', '24h'])
+        report = profiler.profile(dashboards)
+
+        overview = next(d for d in report['dashboards'] if d['title'] == 'Tractus-X Overview')
+        assert set(overview['load_time']) == {'1h', '24h'}
+        assert len(overview['panels']) == 5
+
+        for panel in overview['panels']:
+            for range_name in ('1h', '24h'):
+                stats = panel['ranges'][range_name]
+                assert not stats['errors']
+                assert stats['latency'] >= 0
+                assert stats['series'] > 0
+                assert stats['data_points'] >= stats['series']
+
+        # Report must be serialisable for --json output
+        json.dumps(report)
+
+    def test_recommendations(self, fake_datasource):
+        """Test recording rule and interval recommendations"""
+        dashboard = {
+            'title': 'Heavy',
+            'panels': [{
+                'id': 1,
+                'title': 'Request rate',
+                'gridPos': {'h': 8, 'w': 12, 'x': 0, 'y': 0},  # 960px: 10m step at 7d
+                'targets': [{'expr': 'sum(rate(http_requests_total[5m])) by (service)'}]
+            }, {
+                'id': 2,
+                'title': 'Raw series',
+                'maxDataPoints': 100,
+                'interval': '15s',
+                'targets': [{'expr': 'kube_pod_info'}]
+            }]
+        }
+        profiler = DashboardProfiler(fake_datasource, ranges=['1h', '7d'],
+                                     slow_query_threshold=0, max_series=10)
+        panels = profiler.profile([dashboard])['dashboards'][0]['panels']
+
+        rate_panel, raw_panel = panels
+        assert any(r.startswith('recording rule') for r in rate_panel['recommendations'])
+        assert any(r.startswith('$__rate_interval') for r in rate_panel['recommendations'])
+        assert any(r.startswith('recording rule') for r in raw_panel['recommendations'])
+        assert not any(r.startswith('larger $__interval') for r in raw_panel['recommendations'])
+
+    def test_larger_interval_recommendation(self, fake_datasource):
+        """Test that dense panels and sub-scrape min intervals are flagged"""
+        dashboard = {
+            'title': 'Dense',
+            'panels': [{
+                'id': 1,
+                'title': 'Every pod',
+                'targets': [{'expr': 'kube_pod_info'}]
+            }, {
+                'id': 2,
+                'title': 'Fine grained',
+                'interval': '5s',
+                'targets': [{'expr': 'sum(up)'}]
+            }, {
+                'id': 3,
+                'title': 'Cheap',
+                'targets': [{'expr': 'sum(up)'}]
+            }]
+        }
+        profiler = DashboardProfiler(fake_datasource, ranges=['1h'], max_panel_points=5000)
+        dense, fine, cheap = profiler.profile([dashboard])['dashboards'][0]['panels']
+
+        # 50 series x 241 points at a 15s step
+        assert dense['ranges']['1h']['data_points'] > 5000
+        assert any(r.startswith('larger $__interval: 12050 points') for r in dense['recommendations'])
+        assert fine['ranges']['1h']['interval'] == 5
+        assert any('below the 15s scrape interval' in r for r in fine['recommendations'])
+        assert not cheap['recommendations']
+
+    def test_panels_without_id_are_kept_apart(self, fake_datasource):
+        """Test that panels missing an id are not merged together"""
+        dashboard = {
+            'title': 'Hand written',
+            'panels': [
+                {'title': 'Up', 'targets': [{'expr': 'up'}]},
+                {'title': 'Total up', 'targets': [{'expr': 'sum(up)'}]}
+            ]
+        }
+        profiler = DashboardProfiler(fake_datasource, ranges=['1h'])
+        up, total = profiler.profile([dashboard])['dashboards'][0]['panels']
+
+        assert (up['panel'], up['ranges']['1h']['series']) == ('Up', 50)
+        assert (total['panel'], total['ranges']['1h']['series']) == ('Total up', 1)
+
+    def test_failed_queries_are_reported(self, dashboards):
+        """Test that datasource errors are recorded instead of aborting the run"""
+        class FailingDatasource:
+            def query(self, kind, expr, start, end, step):
+                raise RuntimeError("connection refused")
+
+        profiler = DashboardProfiler(FailingDatasource(), ranges=['1h'])
+        report = profiler.profile(dashboards[:1])
+
+        for panel in report['dashboards'][0]['panels']:
+            assert panel['ranges']['1h']['errors']
+            assert panel['ranges']['1h']['series'] == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -8,9 +8,12 @@ import requests
 import time
 import concurrent.futures
 import statistics
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import subprocess
 import json
+import os
+
+from request_tracing import TraceRecorder, traced_request, summarize, print_summary
 
 class TestPerformance:
     """Performance tests for Tractus-X services"""
@@ -23,15 +26,22 @@ class TestPerformance:
             'test_duration': 60,  # seconds
             'timeout': 30,
             'acceptable_response_time': 2.0,  # seconds
-            'acceptable_error_rate': 0.05  # 5%
+            'acceptable_error_rate': 0.05,  # 5%
+            'trace_sample_rate': float(os.environ.get('TRACE_SAMPLE_RATE', 0)),  # opt-in
+            'trace_output': os.environ.get('TRACE_OUTPUT')  # OTLP/JSON file, optional
         }
     
     def load_test_endpoint(self, url: str, duration: int, concurrent_users: int, 
-                          timeout: int) -> Dict[str, Any]:
+                          timeout: int, trace_recorder: Optional[TraceRecorder] = None) -> Dict[str, Any]:
         """Perform load test on an endpoint"""
         
         def make_request():
             """Make a single request and measure response time"""
+            if trace_recorder and trace_recorder.should_sample():
+                # Cold-connection probe for DNS/connect/TLS/server/download timings; it is
+                # only recorded in the trace file, the assertions use requests.get below
+                trace_recorder.record(traced_request(url, timeout=timeout))
+            
             start_time = time.time()
             try:
                 response = requests.get(url, timeout=timeout)
@@ -116,29 +126,39 @@ class TestPerformance:
         if not edc_services:
             pytest.skip("No EDC services found")
         
-        for edc_url in edc_services:
-            health_url = f"{edc_url}/api/check/health"
-            
-            print(f"Load testing EDC health endpoint: {health_url}")
-            results = self.load_test_endpoint(
-                health_url,
-                performance_config['test_duration'],
-                performance_config['concurrent_users'],
-                performance_config['timeout']
-            )
-            
-            # Assertions
-            assert results['error_rate'] <= performance_config['acceptable_error_rate'], \
-                f"Error rate {results['error_rate']} exceeds acceptable rate"
-            
-            assert results['avg_response_time'] <= performance_config['acceptable_response_time'], \
-                f"Average response time {results['avg_response_time']}s exceeds acceptable limit"
-            
-            print(f"Performance results for {health_url}:")
-            print(f"  Total requests: {results['total_requests']}")
-            print(f"  Error rate: {results['error_rate']:.2%}")
-            print(f"  Avg response time: {results['avg_response_time']:.3f}s")
-            print(f"  95th percentile: {results['p95_response_time']:.3f}s")
+        trace_recorder = TraceRecorder(performance_config['trace_sample_rate'])
+        
+        try:
+            for edc_url in edc_services:
+                health_url = f"{edc_url}/api/check/health"
+                
+                print(f"Load testing EDC health endpoint: {health_url}")
+                results = self.load_test_endpoint(
+                    health_url,
+                    performance_config['test_duration'],
+                    performance_config['concurrent_users'],
+                    performance_config['timeout'],
+                    trace_recorder
+                )
+                
+                # Assertions
+                assert results['error_rate'] <= performance_config['acceptable_error_rate'], \
+                    f"Error rate {results['error_rate']} exceeds acceptable rate"
+                
+                assert results['avg_response_time'] <= performance_config['acceptable_response_time'], \
+                    f"Average response time {results['avg_response_time']}s exceeds acceptable limit"
+                
+                print(f"Performance results for {health_url}:")
+                print(f"  Total requests: {results['total_requests']}")
+                print(f"  Error rate: {results['error_rate']:.2%}")
+                print(f"  Avg response time: {results['avg_response_time']:.3f}s")
+                print(f"  95th percentile: {results['p95_response_time']:.3f}s")
+        finally:
+            # Report traces even when an assertion fails - that is when they matter
+            if trace_recorder.traces:
+                print_summary(summarize(trace_recorder.traces))
+                if performance_config['trace_output']:
+                    trace_recorder.export(performance_config['trace_output'])
 
 
 if __name__ == "__main__":
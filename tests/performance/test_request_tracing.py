@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Tests for per-phase request tracing
+"""
+
+import pytest
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from request_tracing import (
+    PHASES, TraceRecorder, load_traces, summarize, traced_request
+)
+
+
+class HealthHandler(BaseHTTPRequestHandler):
+    """Minimal stand-in for the EDC health endpoint"""
+
+    def do_GET(self):
+        status = 200 if self.path == '/api/check/health' else 404
+        body = b'{"isSystemHealthy": true}'
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestRequestTracing:
+    """Tests for traced requests, OTLP export and the phase summarizer"""
+
+    @pytest.fixture
+    def server_url(self):
+        """Local HTTP server serving a health endpoint"""
+        server = ThreadingHTTPServer(('127.0.0.1', 0), HealthHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+        server.shutdown()
+        server.server_close()
+
+    def test_traced_request_records_phases(self, server_url):
+        """Test that every phase is timed and adds up to the response time"""
+        result = traced_request(f"{server_url}/api/check/health")
+
+        assert result['success']
+        assert result['status_code'] == 200
+        assert result['response_length'] == len(b'{"isSystemHealthy": true}')
+        assert set(result['phases']) == set(PHASES)
+        assert result['phases']['tls'] == 0.0
+        assert sum(result['phases'].values()) <= result['response_time']
+
+    def test_traced_request_failures(self, server_url):
+        """Test that HTTP errors and connection failures are captured"""
+        not_found = traced_request(f"{server_url}/missing")
+        assert not not_found['success']
+        assert not_found['status_code'] == 404
+
+        refused = traced_request("http://127.0.0.1:1/api/check/health", timeout=2)
+        assert not refused['success']
+        assert 'error' in refused
+        assert 'dns' in refused['phases']
+        assert 'server' not in refused['phases']
+
+    def test_traced_request_falls_back_to_next_address(self, server_url, monkeypatch):
+        """Test that an unreachable first address does not fail the request"""
+        port = int(server_url.rsplit(':', 1)[1])
+        reachable = socket.getaddrinfo('127.0.0.1', port, type=socket.SOCK_STREAM)
+        unreachable = socket.getaddrinfo('127.0.0.1', 1, type=socket.SOCK_STREAM)
+        monkeypatch.setattr(socket, 'getaddrinfo', lambda *args, **kwargs: unreachable + reachable)
+
+        result = traced_request(f"http://edc.local:{port}/api/check/health")
+
+        assert result['success'], result.get('error')
+        assert result['status_code'] == 200
+
+    def test_sampling(self):
+        """Test that the sample rate bounds which requests are traced"""
+        assert not any(TraceRecorder(0).should_sample() for _ in range(100))
+        assert all(TraceRecorder(1).should_sample() for _ in range(100))
+
+    def test_otlp_export_roundtrip(self, server_url, tmp_path):
+        """Test that exported OTLP/JSON reloads into the same phase timings"""
+        recorder = TraceRecorder(1)
+        for _ in range(5):
+            recorder.record(traced_request(f"{server_url}/api/check/health"))
+        recorder.record(traced_request(f"{server_url}/missing"))
+
+        otlp = recorder.to_otlp()
+        spans = otlp['resourceSpans'][0]['scopeSpans'][0]['spans']
+        assert len(spans) == 6 * (1 + len(PHASES))
+        assert all(len(s['traceId']) == 32 and len(s['spanId']) == 16 for s in spans)
+
+        output = tmp_path / 'traces.json'
+        recorder.export(str(output))
+        traces = load_traces(str(output))
+
+        assert len(traces) == 6
+        assert sum(not t['success'] for t in traces) == 1
+        assert all(t['probe'] == 'cold_connection' for t in traces)
+        assert summarize(traces)[traces[0]['endpoint']]['probes'] == ['cold_connection']
+        assert all(set(t['phases']) == set(PHASES) for t in traces)
+
+    def test_summarize_percentiles(self):
+        """Test phase-level percentile breakdown per endpoint"""
+        traces = [{
+            'endpoint': 'GET edc:8080/api/check/health',
+            'success': True,
+            'status_code': 200,
+            'response_time': 0.1 * (i + 1),
+            'phases': {'dns': 0.001, 'connect': 0.002, 'tls': 0.0,
+                       'server': 0.1 * i, 'download': 0.001}
+        } for i in range(10)]
+        # A gateway timeout that completed every phase belongs in the breakdown
+        traces.append({
+            'endpoint': 'GET edc:8080/api/check/health',
+            'success': False,
+            'status_code': 504,
+            'response_time': 5.004,
+            'phases': {'dns': 0.001, 'connect': 0.002, 'tls': 0.0,
+                       'server': 5.0, 'download': 0.001}
+        })
+        # A refused connection only contributes the phases it reached
+        traces.append({
+            'endpoint': 'GET edc:8080/api/check/health',
+            'success': False,
+            'response_time': 30.0,
+            'phases': {'dns': 0.002}
+        })
+
+        summary = summarize(traces)['GET edc:8080/api/check/health']
+
+        assert summary['requests'] == 12
+        assert summary['errors'] == 2
+        assert summary['phases']['dns']['max'] == pytest.approx(0.002)
+        assert summary['phases']['server']['max'] == pytest.approx(5.0)
+        assert summary['phases']['server']['p50'] == pytest.approx(0.5)
+        assert summary['phases']['total']['max'] == pytest.approx(5.004)
+
+    def test_status_code_survives_export(self, server_url, tmp_path):
+        """Test that reloaded failed responses still count towards total latency"""
+        recorder = TraceRecorder(1)
+        recorder.record(traced_request(f"{server_url}/missing"))
+        output = tmp_path / 'traces.json'
+        recorder.export(str(output))
+
+        summary = summarize(load_traces(str(output)))
+        stats = next(iter(summary.values()))
+        assert stats['errors'] == 1
+        assert 'total' in stats['phases']
+        assert 'server' in stats['phases']
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])